@@ -1,10 +1,12 @@
+import time
 from datetime import datetime
 from typing import Dict, Optional
 
 from .config import Config, RepoConfig
 from .safety import SafetyGuard
-from .state import StateManager
+from .state import StateManager, STATE_FILE
 from .git_ops import GitWrapper
+from .sharding import ShardCoordinator
 
 class GitAutoCommitterAgent:
     def __init__(self, config: Config, dry_run: bool, force_run: bool = False):
@@ -13,7 +15,8 @@ class GitAutoCommitterAgent:
         self.force_run = force_run
         
         self.guard = SafetyGuard(config)
-        self.state_manager = StateManager()
+        self.state_manager = StateManager(config.cluster.state_file or STATE_FILE)
+        self.shard = ShardCoordinator(config.cluster, self.state_manager) if config.cluster.enabled else None
 
     def generate_message(self, status: str, repo_config: RepoConfig) -> str:
         """
@@ -50,20 +53,66 @@ class GitAutoCommitterAgent:
         if not self.guard.validate_repo(repo_config.path):
             return
 
+        if not self.shard:
+            self._run_checked(repo_config)
+            return
+
+        # 1b. Shard Claim (ring ownership + lease, so only one worker touches the repo)
+        holder = self.shard.claim(repo_config.path)
+        if holder:
+            print(f"[SHARD] {repo_config.path} is owned by worker '{holder}'. Skipping.")
+            return
+        try:
+            self._run_checked(repo_config)
+        finally:
+            self.shard.release(repo_config.path)
+
+    def _run_checked(self, repo_config: RepoConfig):
+        settings = self.config.settings
+
         # 2. State Check (Idempotency)
         if not self.force_run and not self.state_manager.should_run(repo_config.path):
             print(f"[SKIP] Agent already ran for {repo_config.path} today.")
             return
 
-        git = GitWrapper(repo_config.path, self.dry_run)
+        # 2b. Circuit Breaker (repos that keep failing are skipped with backoff)
+        open_until = self.state_manager.circuit_open_until(repo_config.path)
+        if open_until and not self.force_run:
+            print(f"[SKIP] Circuit open for {repo_config.path} until {open_until.isoformat(timespec='seconds')}.")
+            return
+
+        budget = repo_config.timeout if repo_config.timeout is not None else settings.repo_timeout
+        git = GitWrapper(
+            repo_config.path,
+            self.dry_run,
+            command_timeout=settings.command_timeout,
+            deadline=time.monotonic() + budget
+        )
 
-        # 3. Observe
         try:
-            current_branch = git.current_branch()
-            status = git.status()
+            self._process_repo(repo_config, git)
         except Exception as e:
-            print(f"[ERROR] Failed to read git status: {e}")
+            print(f"[ERROR] {repo_config.path}: {e}")
+            if self.dry_run:
+                return
+            open_until = self.state_manager.record_failure(
+                repo_config.path,
+                str(e),
+                settings.circuit_failure_threshold,
+                settings.circuit_backoff_base,
+                settings.circuit_backoff_max
+            )
+            if open_until:
+                print(f"[CIRCUIT] Skipping {repo_config.path} until {open_until.isoformat(timespec='seconds')}.")
             return
+
+        if not self.dry_run:
+            self.state_manager.record_success(repo_config.path)
+
+    def _process_repo(self, repo_config: RepoConfig, git: GitWrapper):
+        # 3. Observe
+        current_branch = git.current_branch()
+        status = git.status()
             
         print(f"[OBSERVE] Branch: {current_branch}")
         
@@ -116,6 +165,9 @@ class GitAutoCommitterAgent:
 
     def run(self):
         print(f"=== Git Agent Starting (DryRun={self.dry_run}, Force={self.force_run}) ===")
+        if self.shard:
+            print(f"[SHARD] Worker '{self.shard.worker_id}' joining cluster {self.config.cluster.workers}")
+            self.shard.join()
         for repo in self.config.repositories:
             self.run_repo(repo)
         print("=== Git Agent Finished ===")
@@ -1,7 +1,10 @@
 import yaml
 import os
+import socket
 from typing import Dict, List, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from .state import LOCKING_SUPPORTED
 
 @dataclass
 class RepoConfig:
@@ -9,21 +12,45 @@ class RepoConfig:
     branch: str = "main"
     commit_prefix: str = "[SDD-Agent]"
     auto_push: bool = False
+    timeout: Optional[float] = None # Per-repo time budget (seconds), overrides settings.repo_timeout
 
 @dataclass
 class GlobalSettings:
     dry_run_default: bool = True
     max_commits_per_run: int = 1
     log_file: str = "git-agent.log"
+    command_timeout: float = 60.0
+    repo_timeout: float = 300.0
+    circuit_failure_threshold: int = 3
+    circuit_backoff_base: float = 900.0
+    circuit_backoff_max: float = 86400.0
+    maintenance_interval_days: int = 7
+    maintenance_command_timeout: float = 900.0
+    maintenance_repo_timeout: float = 1800.0
+
+@dataclass
+class ClusterSettings:
+    enabled: bool = False
+    worker_id: str = field(default_factory=socket.gethostname)
+    workers: List[str] = field(default_factory=list)
+    state_file: Optional[str] = None # Shared state store (e.g. on NFS); defaults to local state.json
+    lease_ttl: float = 2400.0        # Must exceed settings.repo_timeout and maintenance_repo_timeout
+    heartbeat_ttl: float = 900.0     # Workers silent for longer are dropped from the ring
+    vnodes: int = 64
 
 class Config:
-    def __init__(self, data: Dict):
+    def __init__(self, data: Dict, worker_id: Optional[str] = None):
         self.version = data.get("version", 1)
         self.repositories: List[RepoConfig] = []
         self.settings = GlobalSettings()
+        self.cluster = ClusterSettings()
         
         self._load_repos(data.get("repositories", []))
         self._load_settings(data.get("settings", {}))
+        self._load_cluster(data.get("cluster", {}))
+        if worker_id:
+            self.cluster.worker_id = worker_id
+        self._validate_cluster()
 
     def _load_repos(self, repos_data: List[Dict]):
         for r in repos_data:
@@ -35,19 +62,58 @@ class Config:
                 path=os.path.abspath(path),
                 branch=r.get("branch", "main"),
                 commit_prefix=r.get("commit_prefix", "[SDD-Agent]"),
-                auto_push=r.get("auto_push", False)
+                auto_push=r.get("auto_push", False),
+                timeout=r.get("timeout")
             ))
 
     def _load_settings(self, settings_data: Dict):
         self.settings.dry_run_default = settings_data.get("dry_run_default", True)
         self.settings.max_commits_per_run = settings_data.get("max_commits_per_run", 1)
         self.settings.log_file = settings_data.get("log_file", "git-agent.log")
+        self.settings.command_timeout = settings_data.get("command_timeout", 60.0)
+        self.settings.repo_timeout = settings_data.get("repo_timeout", 300.0)
+        self.settings.circuit_failure_threshold = settings_data.get("circuit_failure_threshold", 3)
+        self.settings.circuit_backoff_base = settings_data.get("circuit_backoff_base", 900.0)
+        self.settings.circuit_backoff_max = settings_data.get("circuit_backoff_max", 86400.0)
+        self.settings.maintenance_interval_days = settings_data.get("maintenance_interval_days", 7)
+        self.settings.maintenance_command_timeout = settings_data.get("maintenance_command_timeout", 900.0)
+        self.settings.maintenance_repo_timeout = settings_data.get("maintenance_repo_timeout", 1800.0)
+
+    def _load_cluster(self, cluster_data: Dict):
+        self.cluster.enabled = cluster_data.get("enabled", False)
+        self.cluster.worker_id = str(cluster_data.get("worker_id", self.cluster.worker_id))
+        self.cluster.workers = [str(w) for w in cluster_data.get("workers", [])]
+        state_file = cluster_data.get("state_file")
+        self.cluster.state_file = os.path.abspath(state_file) if state_file else None
+        self.cluster.lease_ttl = cluster_data.get("lease_ttl", 2400.0)
+        self.cluster.heartbeat_ttl = cluster_data.get("heartbeat_ttl", 900.0)
+        self.cluster.vnodes = cluster_data.get("vnodes", 64)
+
+    def _validate_cluster(self):
+        """
+        Sharding is only safe if every worker agrees on the ring and a lease
+        outlives the longest repo pass (leases are not renewed mid-pass).
+        """
+        if not self.cluster.enabled:
+            return
+        if not LOCKING_SUPPORTED:
+            raise ValueError("cluster mode needs fcntl file locking, which this platform lacks")
+        if self.cluster.worker_id not in self.cluster.workers:
+            raise ValueError(
+                f"cluster.worker_id '{self.cluster.worker_id}' is not in cluster.workers {self.cluster.workers}"
+            )
+        budgets = [self.settings.repo_timeout, self.settings.maintenance_repo_timeout]
+        budgets += [r.timeout for r in self.repositories if r.timeout is not None]
+        if self.cluster.lease_ttl <= max(budgets):
+            raise ValueError(
+                f"cluster.lease_ttl ({self.cluster.lease_ttl}s) must exceed the longest repo time budget ({max(budgets)}s)"
+            )
 
-def load_config(path: str) -> Config:
+def load_config(path: str, worker_id: Optional[str] = None) -> Config:
     if not os.path.exists(path):
         raise FileNotFoundError(f"Config file not found: {path}")
     
     with open(path, 'r') as f:
         data = yaml.safe_load(f)
         
-    return Config(data)
+    return Config(data, worker_id)
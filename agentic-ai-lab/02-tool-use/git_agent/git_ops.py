@@ -1,37 +1,128 @@
 import subprocess
 import os
-from typing import List, Tuple
+import signal
+import time
+from typing import List, Optional, Tuple
+
+# Make git fail fast instead of waiting on a prompt nobody will answer
+NON_INTERACTIVE_ENV = {
+    "GIT_TERMINAL_PROMPT": "0",
+    "GIT_ASKPASS": "",
+    "SSH_ASKPASS": "",
+    "SSH_ASKPASS_REQUIRE": "never",
+    "GCM_INTERACTIVE": "never",
+}
+
+# Host-key and passphrase prompts fail instead of waiting for a tty. Only used
+# when nobody chose an ssh command: GIT_SSH_COMMAND beats core.sshCommand and
+# GIT_SSH, so setting it unconditionally would drop per-repo deploy keys.
+BATCH_SSH_COMMAND = "ssh -o BatchMode=yes"
+
+# How long to wait for pipes to close after killing a timed-out command
+KILL_GRACE_SECONDS = 5
+
+# Subcommands that modify the repo and are therefore skipped in dry-run mode
+WRITE_COMMANDS = {"commit", "push", "add", "update-index", "commit-graph", "maintenance", "gc", "repack"}
+
+class GitTimeoutError(RuntimeError):
+    """
+    Raised when a git command exceeds its timeout or the repo's time budget.
+    """
 
 class GitWrapper:
     """
     Abstractions for Git CLI commands.
     """
-    def __init__(self, repo_path: str, dry_run: bool = True):
+    def __init__(self, repo_path: str, dry_run: bool = True,
+                 command_timeout: Optional[float] = None, deadline: Optional[float] = None):
         self.repo_path = repo_path
         self.dry_run = dry_run
+        # Per-command limit in seconds, and absolute time.monotonic() deadline for the repo
+        self.command_timeout = command_timeout
+        self.deadline = deadline
+        self._cached_env: Optional[dict] = None
 
-    def _run(self, args: List[str], check: bool = True) -> str:
+    def _timeout(self, cmd: List[str]) -> Optional[float]:
+        timeout = self.command_timeout
+        if self.deadline is not None:
+            remaining = self.deadline - time.monotonic()
+            if remaining <= 0:
+                raise GitTimeoutError(f"Repo time budget exhausted before: {' '.join(cmd)}")
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        return timeout
+
+    def _run(self, args: List[str], check: bool = True, mutating: Optional[bool] = None) -> str:
         cmd = ["git"] + args
-        if self.dry_run and args[0] in ["commit", "push", "add"]:
+        if mutating is None:
+            mutating = args[0] in WRITE_COMMANDS
+        if self.dry_run and mutating:
             print(f"[DRY-RUN] Would run: {' '.join(cmd)}")
             return "DRY_RUN_OK"
         
+        timeout = self._timeout(cmd)
+        # Own process group so a timeout also kills ssh/credential helpers spawned by git
+        proc = subprocess.Popen(
+            cmd,
+            cwd=self.repo_path,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            env=self._env(),
+            start_new_session=True
+        )
         try:
-            result = subprocess.run(
-                cmd, 
-                cwd=self.repo_path, 
-                capture_output=True, 
-                text=True, 
-                check=check
-            )
-            return result.stdout.strip()
-        except subprocess.CalledProcessError as e:
+            stdout, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self._kill(proc)
+            print(f"[GIT ERROR] Command timed out after {timeout:.0f}s: {' '.join(cmd)}")
+            raise GitTimeoutError(f"Timed out after {timeout:.0f}s: {' '.join(cmd)}")
+
+        if proc.returncode != 0:
             # We don't always want to crash (e.g. check if something is a repo)
             if check:
                 print(f"[GIT ERROR] Command failed: {' '.join(cmd)}")
-                print(f"Stderr: {e.stderr}")
-                raise
+                print(f"Stderr: {stderr}")
+                raise subprocess.CalledProcessError(proc.returncode, cmd, stdout, stderr)
+            return ""
+        return stdout.strip()
+
+    def _env(self) -> dict:
+        if self._cached_env is None:
+            env = {**os.environ, **NON_INTERACTIVE_ENV}
+            if not (env.get("GIT_SSH_COMMAND") or env.get("GIT_SSH") or self._configured_ssh_command(env)):
+                env["GIT_SSH_COMMAND"] = BATCH_SSH_COMMAND
+            self._cached_env = env
+        return self._cached_env
+
+    def _configured_ssh_command(self, env: dict) -> str:
+        # core.sshCommand from repo/global/system config; read directly since
+        # _run() needs the environment we are building
+        try:
+            result = subprocess.run(
+                ["git", "config", "--get", "core.sshCommand"],
+                cwd=self.repo_path, env=env, stdin=subprocess.DEVNULL,
+                capture_output=True, text=True, timeout=self._timeout(["config"])
+            )
+        except (OSError, subprocess.TimeoutExpired):
             return ""
+        return result.stdout.strip()
+
+    @staticmethod
+    def _kill(proc: subprocess.Popen):
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except (AttributeError, ProcessLookupError, PermissionError):
+            proc.kill()
+        try:
+            proc.communicate(timeout=KILL_GRACE_SECONDS)
+        except subprocess.TimeoutExpired:
+            # A helper that left our process group (setsid, ssh ControlMaster)
+            # still holds the pipes; stop waiting for it.
+            for pipe in (proc.stdout, proc.stderr):
+                if pipe:
+                    pipe.close()
+            proc.wait(timeout=KILL_GRACE_SECONDS)
 
     def status(self) -> str:
         return self._run(["status", "--porcelain", "-b"])
@@ -56,3 +147,32 @@ class GitWrapper:
     
     def check_remotes(self) -> str:
         return self._run(["remote", "-v"], check=False)
+
+    def get_config(self, key: str) -> str:
+        return self._run(["config", "--get", key], check=False)
+
+    def set_config(self, key: str, value: str):
+        self._run(["config", key, value], mutating=True)
+
+    def git_path(self, path: str) -> str:
+        return os.path.join(self.repo_path, self._run(["rev-parse", "--git-path", path]))
+
+    def untracked_cache_works(self) -> bool:
+        """
+        Probes whether directory mtimes on this filesystem are reliable enough
+        for core.untrackedCache. Only touches a scratch dir, takes a few seconds.
+        """
+        try:
+            self._run(["update-index", "--test-untracked-cache"], mutating=False)
+        except subprocess.CalledProcessError:
+            return False
+        return True
+
+    def set_index_version(self, version: int):
+        self._run(["update-index", "--index-version", str(version)])
+
+    def write_commit_graph(self):
+        self._run(["commit-graph", "write", "--reachable", "--changed-paths"])
+
+    def maintenance_run(self, tasks: List[str]):
+        self._run(["maintenance", "run"] + [f"--task={t}" for t in tasks])
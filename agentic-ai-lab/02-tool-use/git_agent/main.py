@@ -4,6 +4,7 @@ import os
 
 from .config import load_config
 from .agent import GitAutoCommitterAgent
+from .maintenance import MaintenanceAgent
 
 def main():
     parser = argparse.ArgumentParser(description="Git Auto-Committer Agent (SDD Implementation)")
@@ -11,6 +12,13 @@ def main():
     parser.add_argument("--dry-run", action="store_true", help="Simulate without changes (overrides config)")
     parser.add_argument("--execute", action="store_true", help="Execute changes (overrides dry-run)")
     parser.add_argument("--force", action="store_true", help="Force run (ignores 'once daily' rule)")
+    parser.add_argument("--worker-id", help="Worker identity in sharding mode (overrides cluster.worker_id)")
+
+    # No subcommand = the daily commit pass
+    subparsers = parser.add_subparsers(dest="command")
+    maintain = subparsers.add_parser("maintain", help="Inspect and tune git performance settings of the configured repos")
+    maintain.add_argument("--apply", action="store_true", help="Enable untracked cache, manyFiles/index v4 and commit-graph where missing")
+    maintain.add_argument("--gc", action="store_true", help="Run gc + commit-graph maintenance if settings.maintenance_interval_days has passed")
     
     args = parser.parse_args()
     
@@ -21,7 +29,7 @@ def main():
         sys.exit(1)
         
     try:
-        config = load_config(config_path)
+        config = load_config(config_path, args.worker_id)
     except Exception as e:
         print(f"[FATAL] Invalid config: {e}")
         sys.exit(1)
@@ -46,7 +54,10 @@ def main():
     if is_dry_run:
         print("[INFO] Running in DRY-RUN mode. Use --execute to apply changes.")
 
-    agent = GitAutoCommitterAgent(config, is_dry_run, args.force)
+    if args.command == "maintain":
+        agent = MaintenanceAgent(config, is_dry_run, args.apply, args.gc, args.force)
+    else:
+        agent = GitAutoCommitterAgent(config, is_dry_run, args.force)
     agent.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,185 @@
+import os
+import struct
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .config import Config, RepoConfig
+from .safety import SafetyGuard
+from .state import StateManager, STATE_FILE
+from .git_ops import GitWrapper
+from .sharding import ShardCoordinator
+
+class RepoMaintainer:
+    """
+    Inspects and tunes git's scaling features for one repository.
+    """
+    def __init__(self, git: GitWrapper):
+        self.git = git
+
+    def index_version(self) -> Optional[int]:
+        # Index header: b"DIRC" + 4-byte big-endian version
+        try:
+            with open(self.git.git_path("index"), 'rb') as f:
+                header = f.read(8)
+        except OSError:
+            return None
+        if len(header) < 8 or header[:4] != b"DIRC":
+            return None
+        return struct.unpack(">I", header[4:8])[0]
+
+    def inspect(self) -> Dict[str, object]:
+        return {
+            "core.untrackedCache": self.git.get_config("core.untrackedCache") or "unset",
+            "feature.manyFiles": self.git.get_config("feature.manyFiles") or "unset",
+            "index.version": self.index_version(),
+            "fetch.writeCommitGraph": self.git.get_config("fetch.writeCommitGraph") or "unset",
+            "commit-graph": self.has_commit_graph(),
+        }
+
+    def has_commit_graph(self) -> bool:
+        # Either a single graph file or a split chain (written by
+        # 'git maintenance run --task=commit-graph' and fetch.writeCommitGraph)
+        return any(
+            os.path.exists(self.git.git_path(path))
+            for path in ("objects/info/commit-graph", "objects/info/commit-graphs/commit-graph-chain")
+        )
+
+    def plan(self, facts: Dict[str, object]) -> List[Tuple[str, Callable[[], None]]]:
+        """
+        Returns (description, action) for every feature that is not enabled yet.
+        """
+        git = self.git
+        actions = []
+        if facts["core.untrackedCache"] != "true":
+            if git.untracked_cache_works():
+                actions.append(("enable untracked cache", lambda: git.set_config("core.untrackedCache", "true")))
+            else:
+                print("[DECIDE] Not enabling untracked cache: 'git update-index --test-untracked-cache' failed on this filesystem.")
+        if facts["feature.manyFiles"] != "true":
+            actions.append(("enable feature.manyFiles", lambda: git.set_config("feature.manyFiles", "true")))
+        if facts["index.version"] is not None and facts["index.version"] != 4:
+            actions.append(("rewrite index as v4", lambda: git.set_index_version(4)))
+        if facts["fetch.writeCommitGraph"] != "true":
+            actions.append(("write commit-graph on fetch", lambda: git.set_config("fetch.writeCommitGraph", "true")))
+        if not facts["commit-graph"]:
+            actions.append(("write commit-graph", git.write_commit_graph))
+        return actions
+
+    def apply(self, actions: List[Tuple[str, Callable[[], None]]]):
+        for description, action in actions:
+            print(f"[MAINTAIN] {description}")
+            action()
+
+    def run_gc(self):
+        print("[MAINTAIN] git maintenance run (gc, commit-graph)")
+        self.git.maintenance_run(["gc", "commit-graph"])
+
+    def time_status(self, runs: int = 3) -> float:
+        """
+        Best-of-N wall time of 'git status', in milliseconds.
+        """
+        best = None
+        for _ in range(runs):
+            start = time.perf_counter()
+            self.git.status()
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return round(best, 2)
+
+class MaintenanceAgent:
+    """
+    Drives RepoMaintainer over the configured repos ('maintain' subcommand).
+    Honours the SafetyGuard allowlist, dry-run and sharding like the commit agent.
+    """
+    def __init__(self, config: Config, dry_run: bool, apply: bool = False,
+                 gc: bool = False, force_run: bool = False):
+        self.config = config
+        self.dry_run = dry_run
+        self.apply = apply
+        self.gc = gc
+        self.force_run = force_run
+
+        self.guard = SafetyGuard(config)
+        self.state_manager = StateManager(config.cluster.state_file or STATE_FILE)
+        self.shard = ShardCoordinator(config.cluster, self.state_manager) if config.cluster.enabled else None
+
+    def gc_due(self, repo_path: str) -> bool:
+        last = self.state_manager.last_gc(repo_path)
+        if last is None or self.force_run:
+            return True
+        interval = timedelta(days=self.config.settings.maintenance_interval_days)
+        return datetime.now() - last >= interval
+
+    def run_repo(self, repo_config: RepoConfig):
+        print(f"\n--- Maintaining Repo: {repo_config.path} ---")
+
+        if not self.guard.validate_repo(repo_config.path):
+            return
+
+        if self.shard:
+            holder = self.shard.claim(repo_config.path)
+            if holder:
+                print(f"[SHARD] {repo_config.path} is owned by worker '{holder}'. Skipping.")
+                return
+        try:
+            self._maintain(repo_config)
+        except Exception as e:
+            print(f"[ERROR] {repo_config.path}: {e}")
+        finally:
+            if self.shard:
+                self.shard.release(repo_config.path)
+
+    def _maintain(self, repo_config: RepoConfig):
+        # gc / commit-graph / index rewrites run far longer than a commit pass
+        settings = self.config.settings
+        git = GitWrapper(
+            repo_config.path,
+            self.dry_run,
+            command_timeout=settings.maintenance_command_timeout,
+            deadline=time.monotonic() + settings.maintenance_repo_timeout
+        )
+        maintainer = RepoMaintainer(git)
+
+        # 1. Observe
+        facts = maintainer.inspect()
+        for key, value in facts.items():
+            print(f"[OBSERVE] {key}: {value}")
+        before_ms = maintainer.time_status()
+        print(f"[OBSERVE] status: {before_ms}ms")
+
+        # 2. Decide
+        actions = maintainer.plan(facts) if self.apply else []
+        run_gc = self.gc and self.gc_due(repo_config.path)
+        if self.gc and not run_gc:
+            print("[DECIDE] gc ran recently. Skipping (use --force).")
+
+        # 3. Act
+        if actions or run_gc:
+            maintainer.apply(actions)
+            if run_gc:
+                maintainer.run_gc()
+        else:
+            print("[DECIDE] Nothing to do.")
+        if self.dry_run:
+            return
+
+        # 4. Measure & Record (every real pass, so the fleet has a timing baseline)
+        after_ms = None
+        if actions or run_gc:
+            after_ms = maintainer.time_status()
+            print(f"[RESULT] status: {before_ms}ms -> {after_ms}ms")
+        self.state_manager.record_maintenance(repo_config.path, {
+            "status_ms_before": before_ms,
+            "status_ms_after": after_ms,
+            "applied": [description for description, _ in actions],
+            "gc": run_gc,
+        })
+
+    def run(self):
+        print(f"=== Git Maintenance Starting (DryRun={self.dry_run}, Apply={self.apply}, GC={self.gc}) ===")
+        if self.shard:
+            self.shard.join()
+        for repo in self.config.repositories:
+            self.run_repo(repo)
+        print("=== Git Maintenance Finished ===")
@@ -0,0 +1,70 @@
+import bisect
+import hashlib
+import os
+from typing import List, Optional
+
+from .config import ClusterSettings
+from .state import StateManager
+
+class HashRing:
+    """
+    Consistent hash ring. Removing a worker only moves the repos it owned;
+    every other repo keeps its owner.
+    """
+    def __init__(self, workers: List[str], vnodes: int = 64):
+        self._ring = sorted(
+            (self._hash(f"{worker}#{i}"), worker)
+            for worker in workers
+            for i in range(vnodes)
+        )
+        self._keys = [h for h, _ in self._ring]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.sha1(key.encode()).digest()[:8], "big")
+
+    def owner(self, key: str) -> Optional[str]:
+        if not self._ring:
+            return None
+        idx = bisect.bisect(self._keys, self._hash(key)) % len(self._ring)
+        return self._ring[idx][1]
+
+class ShardCoordinator:
+    """
+    Decides which repos this worker handles in sharding mode.
+
+    A repo is claimed when (1) the ring built over cluster.workers maps it to us
+    and (2) we hold its lease in the shared state store. All configured workers
+    start on the ring, so workers starting at the same time agree on owners.
+    A worker is only dropped once its last heartbeat is older than
+    heartbeat_ttl; its leases expire too, so its repos move to the survivors
+    on the next pass. A configured worker that has never started keeps its
+    share until it heartbeats and then goes stale.
+    """
+    def __init__(self, cluster: ClusterSettings, state_manager: StateManager):
+        self.cluster = cluster
+        self.worker_id = cluster.worker_id
+        self.state_manager = state_manager
+
+    def join(self):
+        self.state_manager.heartbeat(self.worker_id)
+
+    def owner(self, repo_path: str) -> Optional[str]:
+        stale = self.state_manager.stale_workers(self.cluster.workers, self.cluster.heartbeat_ttl)
+        members = [w for w in self.cluster.workers if w not in stale or w == self.worker_id]
+        return HashRing(members, self.cluster.vnodes).owner(os.path.abspath(repo_path))
+
+    def claim(self, repo_path: str) -> Optional[str]:
+        """
+        Returns None if this worker now holds the repo, otherwise the worker that owns it.
+        """
+        # Heartbeat first: also refreshes our view of who is alive
+        self.state_manager.heartbeat(self.worker_id)
+
+        owner = self.owner(repo_path)
+        if owner != self.worker_id:
+            return owner
+        return self.state_manager.acquire_lease(repo_path, self.worker_id, self.cluster.lease_ttl)
+
+    def release(self, repo_path: str):
+        self.state_manager.release_lease(repo_path, self.worker_id)
@@ -1,13 +1,27 @@
 import json
 import os
-from datetime import datetime
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
+try:
+    import fcntl
+except ImportError: # Windows: no advisory locks, single-process use only
+    fcntl = None
+
+LOCKING_SUPPORTED = fcntl is not None
+
 STATE_FILE = "state.json"
 
 class StateManager:
+    """
+    JSON state store. Every read-modify-write happens under an exclusive lock on
+    '<state_file>.lock' and re-reads the file first, so several agent processes
+    (or hosts sharing the file over a network filesystem) can use one store.
+    """
     def __init__(self, state_file: str = STATE_FILE):
         self.state_file = state_file
+        self.lock_file = state_file + ".lock"
         self.state = self._load_state()
 
     def _load_state(self) -> Dict:
@@ -20,8 +34,33 @@ class StateManager:
             return {"history": []}
 
     def _save_state(self):
-        with open(self.state_file, 'w') as f:
+        # Write-then-rename so readers never see a half-written file
+        tmp_file = f"{self.state_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w') as f:
             json.dump(self.state, f, indent=2)
+        os.replace(tmp_file, self.state_file)
+
+    @contextmanager
+    def _locked(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_file, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Reloads the latest state under the lock, yields it for mutation, then saves.
+        """
+        with self._locked():
+            self.state = self._load_state()
+            yield self.state
+            self._save_state()
 
     def should_run(self, repo_path: str) -> bool:
         """
@@ -29,7 +68,10 @@ class StateManager:
         """
         today = datetime.now().strftime("%Y-%m-%d")
         repo_abs = os.path.abspath(repo_path)
-        
+
+        with self._locked():
+            self.state = self._load_state()
+
         for entry in self.state.get("history", []):
             if entry.get("repo") == repo_abs and entry.get("date") == today:
                  # Already ran today
@@ -45,5 +87,106 @@ class StateManager:
             "status": status,
             "details": details
         }
-        self.state.setdefault("history", []).append(entry)
-        self._save_state()
+        with self._transaction() as state:
+            state.setdefault("history", []).append(entry)
+
+    # ------------------------------------------
+    # Circuit breaker: skip repos that keep failing
+    # ------------------------------------------
+
+    def circuit_open_until(self, repo_path: str) -> Optional[datetime]:
+        """
+        Returns the time until which the repo should be skipped, or None if it may run.
+        """
+        circuit = self.state.get("circuits", {}).get(os.path.abspath(repo_path))
+        if not circuit or not circuit.get("open_until"):
+            return None
+        open_until = datetime.fromisoformat(circuit["open_until"])
+        return open_until if datetime.now() < open_until else None
+
+    def record_failure(self, repo_path: str, error: str, threshold: int,
+                       backoff_base: float, backoff_max: float) -> Optional[datetime]:
+        """
+        Counts a consecutive failure. Once `threshold` is reached the circuit opens
+        for backoff_base * 2^(failures - threshold) seconds, capped at backoff_max.
+        Returns the time the circuit stays open until, if it opened.
+        """
+        with self._transaction() as state:
+            circuit = state.setdefault("circuits", {}).setdefault(
+                os.path.abspath(repo_path), {"failures": 0, "open_until": None}
+            )
+            circuit["failures"] += 1
+            circuit["last_error"] = error
+            circuit["last_failure"] = datetime.now().isoformat()
+
+            open_until = None
+            if circuit["failures"] >= threshold:
+                backoff = min(backoff_base * 2 ** (circuit["failures"] - threshold), backoff_max)
+                open_until = datetime.now() + timedelta(seconds=backoff)
+                circuit["open_until"] = open_until.isoformat()
+        return open_until
+
+    def record_success(self, repo_path: str):
+        """
+        Closes the circuit for a repo after a successful pass.
+        """
+        if os.path.abspath(repo_path) not in self.state.get("circuits", {}):
+            return
+        with self._transaction() as state:
+            state.get("circuits", {}).pop(os.path.abspath(repo_path), None)
+
+    # ------------------------------------------
+    # Maintenance history ('maintain' subcommand)
+    # ------------------------------------------
+
+    def record_maintenance(self, repo_path: str, details: Dict):
+        entry = {"timestamp": datetime.now().isoformat(), **details}
+        with self._transaction() as state:
+            state.setdefault("maintenance", {}).setdefault(os.path.abspath(repo_path), []).append(entry)
+
+    def last_gc(self, repo_path: str) -> Optional[datetime]:
+        entries = self.state.get("maintenance", {}).get(os.path.abspath(repo_path), [])
+        runs = [e["timestamp"] for e in entries if e.get("gc")]
+        return datetime.fromisoformat(max(runs)) if runs else None
+
+    # ------------------------------------------
+    # Cluster membership & leases (sharding mode)
+    # ------------------------------------------
+
+    def heartbeat(self, worker_id: str):
+        with self._transaction() as state:
+            state.setdefault("workers", {})[worker_id] = datetime.now().isoformat()
+
+    def stale_workers(self, candidates: List[str], ttl: float) -> List[str]:
+        """
+        Returns the candidates whose last heartbeat is older than `ttl` seconds.
+        Workers that never heartbeated are not stale: they may just be starting.
+        """
+        cutoff = datetime.now() - timedelta(seconds=ttl)
+        seen = self.state.get("workers", {})
+        return [w for w in candidates if w in seen and datetime.fromisoformat(seen[w]) <= cutoff]
+
+    def acquire_lease(self, repo_path: str, owner: str, ttl: float) -> Optional[str]:
+        """
+        Takes (or renews) the lease on a repo for `ttl` seconds.
+        Returns None on success, or the current holder if someone else owns a live lease.
+        """
+        repo_abs = os.path.abspath(repo_path)
+        now = datetime.now()
+        with self._transaction() as state:
+            leases = state.setdefault("leases", {})
+            lease = leases.get(repo_abs)
+            if lease and lease["owner"] != owner and datetime.fromisoformat(lease["expires_at"]) > now:
+                return lease["owner"]
+            leases[repo_abs] = {
+                "owner": owner,
+                "expires_at": (now + timedelta(seconds=ttl)).isoformat()
+            }
+        return None
+
+    def release_lease(self, repo_path: str, owner: str):
+        repo_abs = os.path.abspath(repo_path)
+        with self._transaction() as state:
+            lease = state.get("leases", {}).get(repo_abs)
+            if lease and lease["owner"] == owner:
+                del state["leases"][repo_abs]
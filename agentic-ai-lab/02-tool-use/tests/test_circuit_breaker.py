@@ -0,0 +1,93 @@
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+TOOL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TOOL_DIR)
+
+from git_agent.agent import GitAutoCommitterAgent
+from git_agent.config import Config
+from git_agent.state import StateManager
+
+THRESHOLD = 2
+BACKOFF_BASE = 60.0
+BACKOFF_MAX = 200.0
+
+
+def make_agent(tmp_path, dry_run=False, force_run=False):
+    repo = tmp_path / "repo"
+    if not repo.exists():
+        repo.mkdir()
+        subprocess.run(["git", "init", "-q"], cwd=repo, check=True)
+    config = Config({
+        "repositories": [{"path": str(repo)}],
+        "settings": {
+            "circuit_failure_threshold": THRESHOLD,
+            "circuit_backoff_base": BACKOFF_BASE,
+            "circuit_backoff_max": BACKOFF_MAX,
+        },
+        "cluster": {"state_file": str(tmp_path / "state.json")},
+    })
+    agent = GitAutoCommitterAgent(config, dry_run=dry_run, force_run=force_run)
+    return agent, config.repositories[0]
+
+
+def failing(agent):
+    calls = []
+
+    def process_repo(repo_config, git):
+        calls.append(repo_config.path)
+        raise RuntimeError("remote hung up")
+    agent._process_repo = process_repo
+    return calls
+
+
+def backoff_seconds(open_until):
+    return round((open_until - datetime.now()).total_seconds())
+
+
+def test_backoff_doubles_and_is_capped(tmp_path):
+    state_manager = StateManager(str(tmp_path / "state.json"))
+    record = lambda: state_manager.record_failure("repo", "boom", THRESHOLD, BACKOFF_BASE, BACKOFF_MAX)
+
+    assert record() is None
+    assert state_manager.circuit_open_until("repo") is None
+    assert backoff_seconds(record()) == BACKOFF_BASE
+    assert backoff_seconds(record()) == BACKOFF_BASE * 2
+    assert backoff_seconds(record()) == BACKOFF_MAX
+    assert backoff_seconds(record()) == BACKOFF_MAX
+    assert state_manager.circuit_open_until("repo") is not None
+
+    state_manager.record_success("repo")
+    assert state_manager.circuit_open_until("repo") is None
+    assert StateManager(str(tmp_path / "state.json")).state["circuits"] == {}
+
+
+def test_open_circuit_skips_repo_unless_forced(tmp_path, capsys):
+    agent, repo_config = make_agent(tmp_path)
+    calls = failing(agent)
+
+    for _ in range(THRESHOLD):
+        agent.run_repo(repo_config)
+    assert len(calls) == THRESHOLD
+    assert "[CIRCUIT] Skipping" in capsys.readouterr().out
+
+    agent.run_repo(repo_config)
+    assert len(calls) == THRESHOLD
+    assert "[SKIP] Circuit open" in capsys.readouterr().out
+
+    forced, _ = make_agent(tmp_path, force_run=True)
+    forced._process_repo = lambda repo_config, git: None
+    forced.run_repo(repo_config)
+    assert forced.state_manager.circuit_open_until(repo_config.path) is None
+
+
+def test_dry_run_does_not_touch_circuit_state(tmp_path):
+    agent, repo_config = make_agent(tmp_path, dry_run=True)
+    calls = failing(agent)
+
+    for _ in range(THRESHOLD + 1):
+        agent.run_repo(repo_config)
+    assert len(calls) == THRESHOLD + 1
+    assert not (tmp_path / "state.json").exists()
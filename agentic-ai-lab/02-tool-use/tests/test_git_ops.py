@@ -0,0 +1,89 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+TOOL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TOOL_DIR)
+
+from git_agent import git_ops
+from git_agent.git_ops import BATCH_SSH_COMMAND, GitTimeoutError, GitWrapper
+
+
+def git(repo, *args) -> str:
+    return subprocess.run(["git", *args], cwd=repo, check=True,
+                          capture_output=True, text=True).stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    monkeypatch.delenv("GIT_SSH_COMMAND", raising=False)
+    monkeypatch.delenv("GIT_SSH", raising=False)
+    # Keep the developer's global core.sshCommand out of the picture
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", os.devnull)
+    path = tmp_path / "repo"
+    path.mkdir()
+    git(path, "init", "-q")
+    return path
+
+
+def alive(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+    except OSError:
+        pass
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def test_hung_command_is_killed_within_budget(repo):
+    # The sleep is a grandchild of git: only killing the process group reaches it
+    git(repo, "config", "alias.hang", "!sleep 30 & echo $! > hang.pid; wait")
+    wrapper = GitWrapper(str(repo), dry_run=False, command_timeout=1)
+
+    start = time.monotonic()
+    with pytest.raises(GitTimeoutError):
+        wrapper._run(["hang"], mutating=False)
+    assert time.monotonic() - start < 1 + git_ops.KILL_GRACE_SECONDS
+
+    pid = int((repo / "hang.pid").read_text())
+    for _ in range(50):
+        if not alive(pid):
+            break
+        time.sleep(0.1)
+    assert not alive(pid)
+
+
+def test_timeout_is_capped_by_repo_deadline(repo):
+    wrapper = GitWrapper(str(repo), command_timeout=60, deadline=time.monotonic() + 2)
+    assert wrapper._timeout(["status"]) <= 2
+
+    wrapper = GitWrapper(str(repo), command_timeout=1, deadline=time.monotonic() + 60)
+    assert wrapper._timeout(["status"]) == 1
+
+    wrapper = GitWrapper(str(repo), command_timeout=60, deadline=time.monotonic() - 1)
+    with pytest.raises(GitTimeoutError, match="budget exhausted"):
+        wrapper.status()
+
+
+def test_batch_mode_only_when_no_ssh_command_is_configured(repo, monkeypatch):
+    assert GitWrapper(str(repo))._env()["GIT_SSH_COMMAND"] == BATCH_SSH_COMMAND
+
+    git(repo, "config", "core.sshCommand", "ssh -i deploy_key")
+    assert "GIT_SSH_COMMAND" not in GitWrapper(str(repo))._env()
+    git(repo, "config", "--unset", "core.sshCommand")
+
+    monkeypatch.setenv("GIT_SSH", "/usr/local/bin/my-ssh")
+    assert "GIT_SSH_COMMAND" not in GitWrapper(str(repo))._env()
+    monkeypatch.delenv("GIT_SSH")
+
+    monkeypatch.setenv("GIT_SSH_COMMAND", "ssh -i other_key")
+    assert GitWrapper(str(repo))._env()["GIT_SSH_COMMAND"] == "ssh -i other_key"
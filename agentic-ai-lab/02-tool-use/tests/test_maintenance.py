@@ -0,0 +1,126 @@
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+TOOL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TOOL_DIR)
+
+from git_agent.config import Config
+from git_agent.git_ops import GitWrapper
+from git_agent.maintenance import MaintenanceAgent, RepoMaintainer
+
+GIT_ENV = {
+    **os.environ,
+    "GIT_AUTHOR_NAME": "test", "GIT_AUTHOR_EMAIL": "test@example.com",
+    "GIT_COMMITTER_NAME": "test", "GIT_COMMITTER_EMAIL": "test@example.com",
+}
+
+
+def git(repo, *args) -> str:
+    return subprocess.run(["git", *args], cwd=repo, env=GIT_ENV, check=True,
+                          capture_output=True, text=True).stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path):
+    path = tmp_path / "repo"
+    path.mkdir()
+    git(path, "init", "-q", "-b", "main")
+    (path / "a.txt").write_text("a\n")
+    git(path, "add", "a.txt")
+    git(path, "commit", "-q", "-m", "init")
+    return path
+
+
+@pytest.fixture
+def untracked_cache_ok(monkeypatch):
+    # The real probe sleeps for several seconds; only test_apply_enables_features runs it
+    monkeypatch.setattr(GitWrapper, "untracked_cache_works", lambda self: True)
+
+
+def make_agent(tmp_path, repo, dry_run, apply=True, gc=False, force_run=False):
+    config = Config({
+        "repositories": [{"path": str(repo)}],
+        "settings": {"maintenance_interval_days": 7},
+        "cluster": {"state_file": str(tmp_path / "state.json")},
+    })
+    return MaintenanceAgent(config, dry_run, apply=apply, gc=gc, force_run=force_run)
+
+
+def inspect(repo):
+    return RepoMaintainer(GitWrapper(str(repo))).inspect()
+
+
+def test_apply_enables_features(tmp_path, repo):
+    before = inspect(repo)
+    assert before == {
+        "core.untrackedCache": "unset",
+        "feature.manyFiles": "unset",
+        "index.version": 2,
+        "fetch.writeCommitGraph": "unset",
+        "commit-graph": False,
+    }
+
+    agent = make_agent(tmp_path, repo, dry_run=False)
+    agent.run()
+
+    assert inspect(repo) == {
+        "core.untrackedCache": "true",
+        "feature.manyFiles": "true",
+        "index.version": 4,
+        "fetch.writeCommitGraph": "true",
+        "commit-graph": True,
+    }
+    entries = agent.state_manager.state["maintenance"][str(repo)]
+    assert len(entries) == 1
+    assert "enable untracked cache" in entries[0]["applied"]
+
+
+def test_dry_run_only_prints_plan(tmp_path, repo, capsys, untracked_cache_ok):
+    before = inspect(repo)
+    config_before = (repo / ".git" / "config").read_text()
+
+    make_agent(tmp_path, repo, dry_run=True, gc=True).run()
+
+    out = capsys.readouterr().out
+    assert "[DRY-RUN] Would run: git config core.untrackedCache true" in out
+    assert "[DRY-RUN] Would run: git update-index --index-version 4" in out
+    assert "[DRY-RUN] Would run: git maintenance run --task=gc --task=commit-graph" in out
+    assert inspect(repo) == before
+    assert (repo / ".git" / "config").read_text() == config_before
+    assert not (tmp_path / "state.json").exists()
+
+
+def test_untracked_cache_skipped_when_probe_fails(repo, capsys, monkeypatch):
+    monkeypatch.setattr(GitWrapper, "untracked_cache_works", lambda self: False)
+    maintainer = RepoMaintainer(GitWrapper(str(repo)))
+    descriptions = [description for description, _ in maintainer.plan(maintainer.inspect())]
+    assert "enable untracked cache" not in descriptions
+    assert "enable feature.manyFiles" in descriptions
+    assert "--test-untracked-cache' failed" in capsys.readouterr().out
+
+
+def test_gc_due_respects_interval_and_force(tmp_path, repo):
+    agent = make_agent(tmp_path, repo, dry_run=False, gc=True)
+    assert agent.gc_due(str(repo))
+
+    agent.state_manager.record_maintenance(str(repo), {"gc": True})
+    assert not agent.gc_due(str(repo))
+    assert make_agent(tmp_path, repo, dry_run=False, gc=True, force_run=True).gc_due(str(repo))
+
+    with agent.state_manager._transaction() as state:
+        state["maintenance"][str(repo)][0]["timestamp"] = (datetime.now() - timedelta(days=8)).isoformat()
+    assert agent.gc_due(str(repo))
+
+
+def test_split_commit_graph_chain_is_detected(repo, untracked_cache_ok):
+    git(repo, "commit-graph", "write", "--reachable", "--split")
+    assert not (repo / ".git" / "objects" / "info" / "commit-graph").exists()
+
+    maintainer = RepoMaintainer(GitWrapper(str(repo)))
+    facts = maintainer.inspect()
+    assert facts["commit-graph"] is True
+    assert "write commit-graph" not in [description for description, _ in maintainer.plan(facts)]
@@ -0,0 +1,154 @@
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+import yaml
+
+TOOL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TOOL_DIR)
+
+from git_agent.config import Config
+from git_agent.sharding import HashRing, ShardCoordinator
+from git_agent.state import StateManager
+
+GIT_ENV = {
+    **os.environ,
+    "GIT_AUTHOR_NAME": "test", "GIT_AUTHOR_EMAIL": "test@example.com",
+    "GIT_COMMITTER_NAME": "test", "GIT_COMMITTER_EMAIL": "test@example.com",
+}
+
+
+def git(repo, *args) -> str:
+    return subprocess.run(["git", *args], cwd=repo, env=GIT_ENV, check=True,
+                          capture_output=True, text=True).stdout.strip()
+
+
+def make_repos(root, count):
+    repos = []
+    for i in range(count):
+        repo = root / f"repo{i}"
+        repo.mkdir()
+        git(repo, "init", "-q", "-b", "main")
+        git(repo, "commit", "-q", "--allow-empty", "-m", "init")
+        (repo / "change.txt").write_text("dirty\n")
+        repos.append(repo)
+    return repos
+
+
+def cluster_config(repos, state_file, workers, **cluster):
+    return {
+        "repositories": [{"path": str(r)} for r in repos],
+        "cluster": {"enabled": True, "workers": workers, "state_file": str(state_file), **cluster},
+    }
+
+
+def test_concurrent_workers_commit_each_repo_once(tmp_path):
+    repos = make_repos(tmp_path, 8)
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text(yaml.safe_dump(cluster_config(repos, tmp_path / "state.json", ["w1", "w2", "w3"])))
+
+    env = {**GIT_ENV, "PYTHONPATH": TOOL_DIR}
+
+    def run_worker(worker_id):
+        return subprocess.run(
+            [sys.executable, "-m", "git_agent.main", "--config", str(config_file),
+             "--execute", "--worker-id", worker_id],
+            cwd=tmp_path, env=env, capture_output=True, text=True, timeout=120
+        )
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        results = list(pool.map(run_worker, ["w1", "w2", "w3"]))
+
+    committed_by = {}
+    for worker_id, result in zip(["w1", "w2", "w3"], results):
+        assert result.returncode == 0, result.stdout + result.stderr
+        for section in result.stdout.split("--- Checking Repo: ")[1:]:
+            path, _, log = section.partition(" ---")
+            if "[PLAN] Message:" in log:
+                assert path not in committed_by, path
+                committed_by[path] = worker_id
+
+    # No heartbeats were seeded: every worker must still agree on the ring
+    ring = HashRing(["w1", "w2", "w3"])
+    for repo in repos:
+        # init commit + exactly one agent commit, made by the ring owner
+        assert git(repo, "rev-list", "--count", "HEAD") == "2", repo
+        assert committed_by[str(repo)] == ring.owner(os.path.abspath(repo)), repo
+
+    state = StateManager(str(tmp_path / "state.json")).state
+    assert len(state["history"]) == len(repos)
+    assert state.get("leases") == {}
+
+
+def test_dead_worker_repos_move_to_survivor(tmp_path):
+    repo = str(tmp_path / "repo")
+    state_manager = StateManager(str(tmp_path / "state.json"))
+    stale = (datetime.now() - timedelta(hours=1)).isoformat()
+    with state_manager._transaction() as state:
+        state["workers"] = {"w2": stale}
+        state["leases"] = {repo: {"owner": "w2", "expires_at": stale}}
+
+    config = Config(cluster_config([], tmp_path / "state.json", ["w1", "w2"], worker_id="w1", heartbeat_ttl=60))
+    coordinator = ShardCoordinator(config.cluster, state_manager)
+
+    assert coordinator.claim(repo) is None
+    assert state_manager.state["leases"][repo]["owner"] == "w1"
+
+
+def test_ring_keeps_workers_until_their_heartbeat_goes_stale(tmp_path):
+    state_manager = StateManager(str(tmp_path / "state.json"))
+    stale = (datetime.now() - timedelta(hours=1)).isoformat()
+    with state_manager._transaction() as state:
+        state["workers"] = {"w2": datetime.now().isoformat(), "w3": stale}
+
+    config = Config(cluster_config([], tmp_path / "state.json", ["w1", "w2", "w3", "w4"],
+                                   worker_id="w1", heartbeat_ttl=60))
+    coordinator = ShardCoordinator(config.cluster, state_manager)
+
+    # w4 never heartbeated but stays on the ring; only w3 is dropped
+    ring = HashRing(["w1", "w2", "w4"])
+    for i in range(50):
+        key = f"/repos/{i}"
+        assert coordinator.owner(key) == ring.owner(key)
+
+
+def test_live_lease_blocks_other_worker(tmp_path):
+    repo = str(tmp_path / "repo")
+    state_manager = StateManager(str(tmp_path / "state.json"))
+    assert state_manager.acquire_lease(repo, "w2", ttl=600) is None
+    assert state_manager.acquire_lease(repo, "w1", ttl=600) == "w2"
+    state_manager.release_lease(repo, "w2")
+    assert state_manager.acquire_lease(repo, "w1", ttl=600) is None
+
+
+def test_ring_only_moves_keys_of_removed_worker():
+    keys = [f"/repos/{i}" for i in range(200)]
+    full = HashRing(["w1", "w2", "w3"])
+    reduced = HashRing(["w1", "w2"])
+    for key in keys:
+        if full.owner(key) != "w3":
+            assert reduced.owner(key) == full.owner(key)
+
+
+def test_cluster_config_is_validated(tmp_path):
+    state_file = tmp_path / "state.json"
+    with pytest.raises(ValueError, match="not in cluster.workers"):
+        Config(cluster_config([], state_file, ["w1", "w2"], worker_id="stranger"))
+    with pytest.raises(ValueError, match="lease_ttl"):
+        Config({
+            **cluster_config([], state_file, ["w1"], worker_id="w1", lease_ttl=600),
+            "repositories": [{"path": str(tmp_path), "timeout": 900}],
+        })
+    # --worker-id override is validated too
+    config = Config(cluster_config([], state_file, ["w1", "w2"], worker_id="stranger"), worker_id="w2")
+    assert config.cluster.worker_id == "w2"
+
+
+def test_cluster_mode_refused_without_file_locking(tmp_path, monkeypatch):
+    import git_agent.config as config_module
+    monkeypatch.setattr(config_module, "LOCKING_SUPPORTED", False)
+    with pytest.raises(ValueError, match="fcntl"):
+        Config(cluster_config([], tmp_path / "state.json", ["w1"], worker_id="w1"))
@@ -0,0 +1,562 @@
+# tests/run_pipeline.py
+"""
+Local executor for pipeline.spec.yaml.
+
+Turns the spec into a stage/job DAG and runs it on this machine:
+  - jobs with no dependency between them run concurrently on a worker pool
+  - stage `condition` expressions are evaluated against the run context
+  - job results + artifacts are cached under a content hash of the job
+    definition and its inputs, so unchanged jobs are skipped on re-runs.
+    Inputs are the workdir's files minus declared artifacts (and, in a git
+    work tree, minus gitignored paths). New files that appear during a run
+    are remembered as undeclared outputs and ignored afterwards; files that
+    existed before the run stay inputs, so editing them mid-run (by hand or
+    from a formatter job) invalidates the cache on the next run.
+  - the critical path of the run is reported at the end
+
+Jobs run as local processes (`command` through the shell). Typed jobs without
+a `command` (e.g. `container_build`, `deployment`) are contracts for the CI
+service and are recorded as no-ops here.
+
+Usage:
+    python run_pipeline.py --workdir /path/to/service --var DOCKER_REGISTRY=local
+"""
+import argparse
+import ast
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+import yaml
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SPEC = os.path.join(HERE, "..", "pipeline.spec.yaml")
+CACHE_DIR = ".pipeline-cache"
+
+# Job outcomes. Only the first three count as "succeeded" for dependents.
+SUCCESS = "success"
+CACHED = "cached"
+NOOP = "noop"
+FAILED = "failed"
+SKIPPED = "skipped"
+OK_STATUSES = {SUCCESS, CACHED, NOOP}
+
+
+def load_yaml(path):
+    with open(path, 'r') as f:
+        return yaml.safe_load(f)
+
+
+# ==========================================
+# 1. Spec -> DAG
+# ==========================================
+
+@dataclass
+class Job:
+    stage: str
+    name: str
+    spec: Dict
+    deps: List[str] = field(default_factory=list)
+
+    @property
+    def key(self) -> str:
+        return f"{self.stage}.{self.name}"
+
+    @property
+    def artifact_paths(self) -> List[str]:
+        return [a["path"] for a in self.spec.get("artifacts", []) if a.get("path")]
+
+
+def build_dag(spec: Dict) -> Dict[str, Job]:
+    """
+    Expands stages into jobs. Every job of a stage depends on every job of the
+    stages listed in its `needs`. Raises ValueError on unknown needs or cycles.
+    """
+    stages = spec.get("stages", [])
+    stage_ids = [s["id"] for s in stages]
+    jobs_by_stage: Dict[str, List[Job]] = {}
+
+    for stage in stages:
+        for need in stage.get("needs", []):
+            if need not in stage_ids:
+                raise ValueError(f"Stage '{stage['id']}' needs unknown stage '{need}'")
+        jobs_by_stage[stage["id"]] = [Job(stage["id"], j["name"], j) for j in stage.get("jobs", [])]
+
+    # Stage-level topological order (also catches cycles)
+    order: List[str] = []
+    visiting, done = set(), set()
+
+    def visit(stage_id: str):
+        if stage_id in done:
+            return
+        if stage_id in visiting:
+            raise ValueError(f"Cycle detected in stage needs at '{stage_id}'")
+        visiting.add(stage_id)
+        stage = next(s for s in stages if s["id"] == stage_id)
+        for need in stage.get("needs", []):
+            visit(need)
+        visiting.discard(stage_id)
+        done.add(stage_id)
+        order.append(stage_id)
+
+    for stage_id in stage_ids:
+        visit(stage_id)
+
+    dag: Dict[str, Job] = {}
+    for stage_id in order:
+        stage = next(s for s in stages if s["id"] == stage_id)
+        upstream = [j.key for need in stage.get("needs", []) for j in jobs_by_stage[need]]
+        for job in jobs_by_stage[stage_id]:
+            job.deps = upstream
+            dag[job.key] = job
+    return dag
+
+
+# ==========================================
+# 2. Conditions & Variables
+# ==========================================
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not,
+    ast.Compare, ast.Eq, ast.NotEq, ast.In, ast.NotIn,
+    ast.Name, ast.Load, ast.Constant, ast.List, ast.Tuple,
+)
+
+
+def evaluate_condition(expr: Optional[str], context: Dict) -> bool:
+    """
+    Evaluates a spec `condition` such as "branch == 'main'".
+    Only comparisons, boolean operators and literals are allowed.
+    """
+    if not expr:
+        return True
+    try:
+        tree = ast.parse(expr, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid condition '{expr}': {e.msg}")
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Unsupported syntax in condition '{expr}': {type(node).__name__}")
+        if isinstance(node, ast.Name) and node.id not in context:
+            raise ValueError(f"Unknown name '{node.id}' in condition '{expr}'")
+    return bool(eval(compile(tree, "<condition>", "eval"), {"__builtins__": {}}, dict(context)))
+
+
+def resolve_variables(spec: Dict, overrides: Dict[str, str]) -> Dict[str, str]:
+    """
+    Resolves spec variables: --var override > environment > spec default.
+    Raises ValueError if a required variable has no value.
+    """
+    resolved = {}
+    missing = []
+    for var in spec.get("variables", []):
+        name = var["name"]
+        if name in overrides:
+            resolved[name] = overrides[name]
+        elif name in os.environ:
+            resolved[name] = os.environ[name]
+        elif "default" in var:
+            resolved[name] = str(var["default"])
+        elif var.get("required"):
+            missing.append(name)
+    if missing:
+        raise ValueError(f"Missing required variables: {missing} (pass --var NAME=VALUE)")
+    # Extra overrides are passed through as well
+    for name, value in overrides.items():
+        resolved.setdefault(name, value)
+    return resolved
+
+
+def detect_branch(workdir: str) -> str:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
+            cwd=workdir, capture_output=True, text=True, check=True
+        )
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+# ==========================================
+# 3. Content-addressed cache
+# ==========================================
+
+class JobCache:
+    """
+    Stores job results under <cache_dir>/<key>/ where key is a sha256 of the
+    job definition, resolved variables, workdir tree and upstream job keys.
+    """
+    def __init__(self, workdir: str, cache_dir: str):
+        self.workdir = workdir
+        self.cache_dir = cache_dir
+        self.stat_cache_file = os.path.join(cache_dir, "stat-cache.json")
+        self.outputs_file = os.path.join(cache_dir, "outputs.json")
+        self._files_before_run: Set[str] = set()
+
+    def _list_files(self) -> List[str]:
+        """
+        Relative paths of the workdir's input files. In a git work tree this is
+        tracked + untracked-but-not-ignored files, so gitignored build output
+        never reaches the cache keys; otherwise every file except .git.
+        """
+        try:
+            result = subprocess.run(
+                ["git", "ls-files", "-co", "--exclude-standard", "-z"],
+                cwd=self.workdir, capture_output=True, check=True
+            )
+            return sorted(os.path.normpath(p) for p in result.stdout.decode().split("\0") if p)
+        except (OSError, subprocess.CalledProcessError):
+            pass
+
+        paths = []
+        for root, dirs, files in os.walk(self.workdir):
+            dirs[:] = [d for d in dirs if d != ".git"]
+            rel_root = os.path.relpath(root, self.workdir)
+            paths.extend(os.path.normpath(os.path.join(rel_root, name)) for name in files)
+        return sorted(paths)
+
+    def tree_digest(self, exclude: List[str]) -> str:
+        """
+        Hashes the content of every input file, skipping the cache itself,
+        declared artifacts (outputs must not change inputs) and files earlier
+        runs created (see remember_outputs).
+        File digests are reused when size and mtime are unchanged.
+        """
+        try:
+            with open(self.stat_cache_file, 'r') as f:
+                stat_cache = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            stat_cache = {}
+
+        files = self._list_files()
+        self._files_before_run = set(files)
+        excluded = {os.path.normpath(p) for p in exclude} | self._load_outputs()
+        cache_prefix = os.path.relpath(self.cache_dir, self.workdir) + os.sep
+        fresh_cache = {}
+        tree = hashlib.sha256()
+
+        for rel in files:
+            if rel in excluded or rel.startswith(cache_prefix):
+                continue
+            path = os.path.join(self.workdir, rel)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            cached = stat_cache.get(rel)
+            if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+                digest = cached[2]
+            else:
+                digest = _file_digest(path)
+            fresh_cache[rel] = [st.st_size, st.st_mtime_ns, digest]
+            tree.update(f"{rel}\0{digest}\n".encode())
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        _atomic_write_json(self.stat_cache_file, fresh_cache)
+        return tree.hexdigest()
+
+    def remember_outputs(self):
+        """
+        Records the files that did not exist when tree_digest() listed the
+        inputs as undeclared outputs, so later runs ignore them. Files that
+        existed before the run stay inputs even if a job (or the user) rewrote
+        them meanwhile: the next run sees the new content and misses the cache.
+        """
+        created = set(self._list_files()) - self._files_before_run
+        outputs = self._load_outputs()
+        if created - outputs:
+            _atomic_write_json(self.outputs_file, sorted(outputs | created))
+
+    def _load_outputs(self) -> Set[str]:
+        try:
+            with open(self.outputs_file, 'r') as f:
+                return set(json.load(f))
+        except (OSError, json.JSONDecodeError):
+            return set()
+
+    @staticmethod
+    def job_key(job: Job, variables: Dict, tree_digest: str, upstream_keys: List[str]) -> str:
+        payload = {
+            "stage": job.stage,
+            "job": job.spec,
+            "variables": variables,
+            "tree": tree_digest,
+            "upstream": sorted(upstream_keys),
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        try:
+            with open(os.path.join(self.cache_dir, key, "result.json"), 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def restore(self, key: str, job: Job):
+        artifact_root = os.path.join(self.cache_dir, key, "artifacts")
+        for rel in job.artifact_paths:
+            src = os.path.join(artifact_root, rel)
+            if os.path.exists(src):
+                dst = os.path.join(self.workdir, rel)
+                os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+                shutil.copy2(src, dst)
+
+    def store(self, key: str, job: Job, result: Dict):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=f"{key[:12]}.", dir=self.cache_dir)
+        for rel in job.artifact_paths:
+            src = os.path.join(self.workdir, rel)
+            if os.path.exists(src):
+                dst = os.path.join(staging, "artifacts", rel)
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                shutil.copy2(src, dst)
+        with open(os.path.join(staging, "result.json"), 'w') as f:
+            json.dump(result, f, indent=2)
+        final = os.path.join(self.cache_dir, key)
+        if os.path.exists(final):
+            shutil.rmtree(final)
+        os.replace(staging, final)
+
+
+def _file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _atomic_write_json(path: str, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+# ==========================================
+# 4. Execution
+# ==========================================
+
+@dataclass
+class JobResult:
+    key: str
+    status: str
+    duration: float = 0.0
+    returncode: Optional[int] = None
+    log: str = ""
+    reason: str = ""
+
+
+def execute_job(job: Job, workdir: str, env: Dict[str, str]) -> JobResult:
+    command = job.spec.get("command")
+    if not command:
+        return JobResult(job.key, NOOP, reason=f"type '{job.spec.get('type', 'unknown')}' has no local command")
+
+    start = time.monotonic()
+    proc = subprocess.run(
+        command, shell=True, cwd=workdir, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    duration = time.monotonic() - start
+    status = SUCCESS if proc.returncode == 0 else FAILED
+    return JobResult(job.key, status, duration, proc.returncode, proc.stdout)
+
+
+class PipelineRunner:
+    def __init__(self, spec: Dict, workdir: str, variables: Dict[str, str], branch: str,
+                 workers: int, cache: Optional[JobCache]):
+        self.spec = spec
+        self.dag = build_dag(spec)
+        self.workdir = workdir
+        self.variables = variables
+        self.branch = branch
+        self.workers = workers
+        self.cache = cache
+        self.stages = {s["id"]: s for s in spec.get("stages", [])}
+        self.context = {"branch": branch, "true": True, "false": False, **variables}
+        self.env = {**os.environ, **variables, "BRANCH": branch}
+        self.env.setdefault("BUILD_ID", "local")
+
+        self.results: Dict[str, JobResult] = {}
+        self.cache_keys: Dict[str, str] = {}
+        # The context is fixed for the run, so evaluate every condition up front:
+        # a bad expression fails here (ValueError) instead of mid-run.
+        self._stage_enabled: Dict[str, bool] = {
+            stage_id: evaluate_condition(stage.get("condition"), self.context)
+            for stage_id, stage in self.stages.items()
+        }
+
+    def _stage_condition(self, stage_id: str) -> bool:
+        return self._stage_enabled[stage_id]
+
+    def _run_one(self, job: Job) -> JobResult:
+        key = self.cache_keys.get(job.key)
+        if key:
+            start = time.monotonic()
+            hit = self.cache.lookup(key)
+            if hit and hit.get("status") == SUCCESS:
+                self.cache.restore(key, job)
+                return JobResult(job.key, CACHED, time.monotonic() - start, 0, hit.get("log", ""),
+                                 reason=f"key {key[:12]}, originally {hit.get('duration', 0):.2f}s")
+
+        result = execute_job(job, self.workdir, self.env)
+        if key and result.status == SUCCESS:
+            self.cache.store(key, job, {"status": SUCCESS, "duration": result.duration, "log": result.log})
+        return result
+
+    def _artifact_paths(self) -> List[str]:
+        return [p for job in self.dag.values() for p in job.artifact_paths]
+
+    def _prepare_cache_keys(self) -> Optional[str]:
+        if not self.cache:
+            return None
+        tree = self.cache.tree_digest(exclude=self._artifact_paths())
+        for key, job in self.dag.items():  # dag is in topological order
+            upstream = [self.cache_keys[d] for d in job.deps]
+            self.cache_keys[key] = JobCache.job_key(job, self.variables, tree, upstream)
+        return tree
+
+    def run(self) -> float:
+        tree = self._prepare_cache_keys()
+        try:
+            return self._schedule()
+        finally:
+            if tree:
+                self.cache.remember_outputs()
+
+    def _schedule(self) -> float:
+        pending = dict(self.dag)
+        start = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            running = {}
+            while pending or running:
+                for key, job in list(pending.items()):
+                    if not all(d in self.results for d in job.deps):
+                        continue
+                    del pending[key]
+                    blocked = [d for d in job.deps if self.results[d].status not in OK_STATUSES]
+                    if blocked:
+                        self._finish(JobResult(key, SKIPPED, reason=f"upstream {blocked[0]} {self.results[blocked[0]].status}"))
+                    elif not self._stage_condition(job.stage):
+                        cond = self.stages[job.stage].get("condition")
+                        self._finish(JobResult(key, SKIPPED, reason=f"condition false: {cond}"))
+                    else:
+                        print(f"▶️  {key}")
+                        running[pool.submit(self._run_one, job)] = key
+
+                if not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    key = running.pop(future)
+                    try:
+                        self._finish(future.result())
+                    except Exception as e:
+                        self._finish(JobResult(key, FAILED, reason=str(e)))
+
+        return time.monotonic() - start
+
+    def _finish(self, result: JobResult):
+        self.results[result.key] = result
+        icon = {SUCCESS: "✅", CACHED: "♻️ ", NOOP: "⏭️ ", FAILED: "❌", SKIPPED: "⏭️ "}[result.status]
+        detail = f" ({result.reason})" if result.reason else ""
+        print(f"{icon} {result.key}: {result.status} in {result.duration:.2f}s{detail}")
+        if result.status == FAILED and result.log:
+            for line in result.log.rstrip().splitlines()[-20:]:
+                print(f"    | {line}")
+
+    def critical_path(self) -> List[str]:
+        """
+        Longest chain of completed jobs through the DAG, weighted by duration.
+        """
+        finish: Dict[str, float] = {}
+        parent: Dict[str, Optional[str]] = {}
+        for key, job in self.dag.items():
+            result = self.results.get(key)
+            if not result or result.status not in OK_STATUSES:
+                continue
+            best = max(job.deps, key=lambda d: finish.get(d, 0.0), default=None)
+            parent[key] = best if best in finish else None
+            finish[key] = result.duration + (finish[best] if best in finish else 0.0)
+        if not finish:
+            return []
+        node: Optional[str] = max(finish, key=finish.get)
+        path = []
+        while node:
+            path.append(node)
+            node = parent[node]
+        return list(reversed(path))
+
+
+# ==========================================
+# 5. Entrypoint
+# ==========================================
+
+def parse_vars(pairs: List[str]) -> Dict[str, str]:
+    out = {}
+    for pair in pairs:
+        if "=" not in pair:
+            raise ValueError(f"Invalid --var '{pair}', expected NAME=VALUE")
+        name, value = pair.split("=", 1)
+        out[name] = value
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run pipeline.spec.yaml locally as a parallel DAG")
+    parser.add_argument("--spec", default=DEFAULT_SPEC, help="Path to pipeline spec")
+    parser.add_argument("--workdir", default=".", help="Directory jobs run in")
+    parser.add_argument("--branch", help="Branch for conditions (default: current git branch)")
+    parser.add_argument("--var", action="append", default=[], help="Variable override NAME=VALUE")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 2, help="Worker pool size")
+    parser.add_argument("--cache-dir", help=f"Job cache location (default: <workdir>/{CACHE_DIR})")
+    parser.add_argument("--no-cache", action="store_true", help="Always execute jobs")
+    parser.add_argument("--plan", action="store_true", help="Print the DAG and exit")
+    args = parser.parse_args()
+
+    workdir = os.path.abspath(args.workdir)
+    spec = load_yaml(args.spec)
+
+    try:
+        variables = resolve_variables(spec, parse_vars(args.var))
+        branch = args.branch if args.branch is not None else detect_branch(workdir)
+        cache = None if args.no_cache else JobCache(workdir, os.path.abspath(args.cache_dir or os.path.join(workdir, CACHE_DIR)))
+        runner = PipelineRunner(spec, workdir, variables, branch, max(1, args.jobs), cache)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+
+    if args.plan:
+        for key, job in runner.dag.items():
+            deps = ", ".join(job.deps) or "-"
+            print(f"{key:<32} needs: {deps}")
+        return
+
+    print(f"🚀 Running {spec.get('meta', {}).get('name', args.spec)} "
+          f"(branch={branch or '?'}, workers={runner.workers}, cache={'off' if cache is None else 'on'})")
+    wall = runner.run()
+
+    path = runner.critical_path()
+    path_time = sum(runner.results[k].duration for k in path)
+    print("\n⏱️  Critical path: " + (" -> ".join(path) or "(none)"))
+    print(f"   {path_time:.2f}s on critical path, {wall:.2f}s wall clock")
+
+    failed = [k for k, r in runner.results.items() if r.status == FAILED]
+    if failed:
+        print(f"❌ Pipeline FAILED: {failed}")
+        sys.exit(1)
+    print("✅ Pipeline PASSED")
+
+
+if __name__ == "__main__":
+    main()
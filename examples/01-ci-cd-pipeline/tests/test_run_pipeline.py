@@ -0,0 +1,130 @@
+# tests/test_run_pipeline.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import run_pipeline as rp
+
+
+def make_spec(condition="branch == 'main'"):
+    return {
+        "variables": [{"name": "REG", "default": "local"}],
+        "stages": [
+            {"id": "build", "jobs": [
+                {"name": "compile", "command": "mkdir -p build && echo obj > build/obj && echo bin > out.bin",
+                 "artifacts": [{"path": "out.bin"}]},
+                {"name": "lint", "command": "echo lint >> lint.log"},
+            ]},
+            {"id": "test", "needs": ["build"], "jobs": [
+                {"name": "unit", "command": "test -f out.bin && echo ran >> unit.log"},
+            ]},
+            {"id": "deploy", "needs": ["test"], "condition": condition, "jobs": [
+                {"name": "push", "command": "echo pushed > pushed.txt"},
+            ]},
+            {"id": "notify", "needs": ["deploy"], "jobs": [
+                {"name": "mail", "command": "echo mailed > mailed.txt"},
+            ]},
+        ],
+    }
+
+
+def make_runner(workdir, spec=None, branch="main", cache=True):
+    spec = spec or make_spec()
+    job_cache = rp.JobCache(str(workdir), str(workdir / rp.CACHE_DIR)) if cache else None
+    return rp.PipelineRunner(spec, str(workdir), rp.resolve_variables(spec, {}), branch, 2, job_cache)
+
+
+def statuses(runner):
+    return {key: result.status for key, result in runner.results.items()}
+
+
+def test_dag_order_and_deps():
+    dag = rp.build_dag(make_spec())
+    order = list(dag)
+    assert order.index("build.compile") < order.index("test.unit") < order.index("deploy.push")
+    assert dag["test.unit"].deps == ["build.compile", "build.lint"]
+    assert dag["build.lint"].deps == []
+
+
+def test_unknown_needs_and_cycles_are_rejected():
+    with pytest.raises(ValueError, match="unknown stage"):
+        rp.build_dag({"stages": [{"id": "a", "needs": ["nope"], "jobs": []}]})
+    with pytest.raises(ValueError, match="Cycle"):
+        rp.build_dag({"stages": [
+            {"id": "a", "needs": ["b"], "jobs": []},
+            {"id": "b", "needs": ["a"], "jobs": []},
+        ]})
+
+
+def test_bad_condition_fails_before_anything_runs(tmp_path):
+    for condition in ("branch == ", "unknown_name == 'x'", "__import__('os')"):
+        with pytest.raises(ValueError):
+            make_runner(tmp_path, make_spec(condition))
+    assert not os.listdir(tmp_path)
+
+
+def test_false_condition_skips_stage_and_downstream(tmp_path):
+    runner = make_runner(tmp_path, branch="dev", cache=False)
+    runner.run()
+    result = statuses(runner)
+    assert result["test.unit"] == rp.SUCCESS
+    assert result["deploy.push"] == rp.SKIPPED
+    assert result["notify.mail"] == rp.SKIPPED
+    assert not (tmp_path / "pushed.txt").exists()
+
+
+def test_unchanged_rerun_hits_cache_despite_undeclared_outputs(tmp_path):
+    (tmp_path / "main.go").write_text("package main\n")
+
+    first = make_runner(tmp_path)
+    first.run()
+    assert set(statuses(first).values()) == {rp.SUCCESS}
+
+    # build/, lint.log, unit.log ... are undeclared outputs of the first run
+    second = make_runner(tmp_path)
+    second.run()
+    assert set(statuses(second).values()) == {rp.CACHED}
+    assert (tmp_path / "lint.log").read_text() == "lint\n"
+
+    # A real input change invalidates the keys again
+    (tmp_path / "main.go").write_text("package main // changed\n")
+    third = make_runner(tmp_path)
+    third.run()
+    assert set(statuses(third).values()) == {rp.SUCCESS}
+
+
+def test_input_modified_during_run_is_not_cached(tmp_path):
+    (tmp_path / "main.go").write_text("v1\n")
+    spec = make_spec()
+    # Stands in for a user save or a formatter job rewriting a tracked file
+    spec["stages"][0]["jobs"].append(
+        {"name": "edit", "command": "grep -q v1 main.go && echo 'v2 broken' > main.go"})
+
+    first = make_runner(tmp_path, spec)
+    first.run()
+    assert first.results["build.edit"].status == rp.SUCCESS
+
+    second = make_runner(tmp_path, spec)
+    second.run()
+    assert second.results["build.edit"].status == rp.FAILED
+
+
+def test_cache_hit_restores_artifacts(tmp_path):
+    make_runner(tmp_path).run()
+    os.remove(tmp_path / "out.bin")
+
+    runner = make_runner(tmp_path)
+    runner.run()
+    assert runner.results["build.compile"].status == rp.CACHED
+    assert (tmp_path / "out.bin").read_text() == "bin\n"
+    assert runner.results["test.unit"].status == rp.CACHED
+
+
+def test_critical_path_follows_dependencies(tmp_path):
+    runner = make_runner(tmp_path, cache=False)
+    runner.run()
+    path = runner.critical_path()
+    assert path[0].startswith("build.")
+    assert path[1:] == ["test.unit", "deploy.push", "notify.mail"]
@@ -0,0 +1,496 @@
+# tools/spec_lint.py
+"""
+Bulk linter for every spec kind shipped in this repo.
+
+  - pipeline      examples/01-ci-cd-pipeline/pipeline.spec.yaml
+  - infra         templates/infra-spec.yaml
+  - agent         agentic-ai-lab/02-tool-use/git-agent.spec.yaml
+  - feature       templates/feature-spec.md        (markdown)
+  - agent-prompt  templates/agent-prompt-spec.md   (markdown)
+
+Each kind's schema is compiled once (per process) into plain checker
+closures. Files are linted in parallel on a process pool and the result is
+a single JSON report. Markdown specs are checked for their required
+sections, and their YAML front-matter (if any) is validated as well.
+
+Usage:
+    python tools/spec_lint.py [PATH ...] [-j N] [--format json|text] [--output report.json]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import yaml
+
+# libyaml is several times faster than the pure-Python loader when available
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+SPEC_SUFFIXES = ("spec.yaml", "spec.yml", "spec.md")
+SKIP_DIRS = {".git", "node_modules", ".venv", "venv", "__pycache__", ".tox", ".nox", ".pipeline-cache"}
+SERIAL_THRESHOLD = 64 # below this, pool start-up costs more than it saves
+
+Checker = Callable[[object, str, List[str]], None]
+
+
+# ==========================================
+# 1. Schema -> checker compilation
+# ==========================================
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "boolean": bool,
+    "number": (int, float),
+    "scalar": (str, int, float, bool),
+}
+
+
+def compile_schema(schema: Dict) -> Checker:
+    """
+    Compiles a JSON-Schema-like dict (type, properties, required, items, enum,
+    minItems) into a checker(value, path, errors). Unknown keys are allowed:
+    specs are free to carry extra fields.
+    """
+    checks: List[Checker] = []
+
+    expected = schema.get("type")
+    if expected:
+        py_type = _TYPES[expected]
+
+        def check_type(value, path, errors, py_type=py_type, expected=expected):
+            # bool is an int subclass; don't let True pass as a number
+            if not isinstance(value, py_type) or (expected == "number" and isinstance(value, bool)):
+                errors.append(f"{path}: expected {expected}, got {type(value).__name__}")
+                return False
+            return True
+    else:
+        check_type = None
+
+    if "enum" in schema:
+        allowed = frozenset(schema["enum"])
+
+        def check_enum(value, path, errors):
+            if value not in allowed:
+                errors.append(f"{path}: must be one of {sorted(allowed)}, got {value!r}")
+        checks.append(check_enum)
+
+    if "properties" in schema or "required" in schema:
+        required = tuple(schema.get("required", ()))
+        props = tuple((key, compile_schema(sub)) for key, sub in schema.get("properties", {}).items())
+
+        def check_object(value, path, errors):
+            for key in required:
+                if key not in value:
+                    errors.append(f"{path}: missing required key '{key}'")
+            for key, sub in props:
+                if key in value and value[key] is not None:
+                    sub(value[key], f"{path}.{key}", errors)
+        checks.append(check_object)
+
+    if "items" in schema or "minItems" in schema:
+        item_check = compile_schema(schema["items"]) if "items" in schema else None
+        min_items = schema.get("minItems", 0)
+
+        def check_array(value, path, errors):
+            if len(value) < min_items:
+                errors.append(f"{path}: expected at least {min_items} item(s)")
+            if item_check:
+                for i, item in enumerate(value):
+                    item_check(item, f"{path}[{i}]", errors)
+        checks.append(check_array)
+
+    checks = tuple(checks)
+
+    def check(value, path, errors):
+        if check_type and not check_type(value, path, errors):
+            return
+        for c in checks:
+            c(value, path, errors)
+    return check
+
+
+# ==========================================
+# 2. Spec kinds
+# ==========================================
+
+STR = {"type": "string"}
+STR_LIST = {"type": "array", "items": STR}
+
+PIPELINE_SCHEMA = {
+    "type": "object",
+    "required": ["meta", "stages"],
+    "properties": {
+        "meta": {
+            "type": "object",
+            "required": ["name", "version"],
+            "properties": {"name": STR, "version": STR, "owner": STR, "description": STR},
+        },
+        "triggers": {"type": "object"},
+        "variables": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["name"],
+                "properties": {"name": STR, "required": {"type": "boolean"}, "description": STR},
+            },
+        },
+        "stages": {
+            "type": "array",
+            "minItems": 1,
+            "items": {
+                "type": "object",
+                "required": ["id", "jobs"],
+                "properties": {
+                    "id": STR,
+                    "name": STR,
+                    "needs": STR_LIST,
+                    "condition": STR,
+                    "jobs": {
+                        "type": "array",
+                        "minItems": 1,
+                        "items": {
+                            "type": "object",
+                            "required": ["name"],
+                            "properties": {
+                                "name": STR,
+                                "image": STR,
+                                "command": STR,
+                                "type": STR,
+                                "artifacts": {
+                                    "type": "array",
+                                    "items": {"type": "object", "required": ["path"], "properties": {"path": STR, "type": STR}},
+                                },
+                            },
+                        },
+                    },
+                },
+            },
+        },
+    },
+}
+
+INFRA_SCHEMA = {
+    "type": "object",
+    "required": ["apiVersion", "kind", "metadata", "resources"],
+    "properties": {
+        "apiVersion": STR,
+        "kind": {"type": "string", "enum": ["InfrastructureSpec"]},
+        "metadata": {"type": "object", "required": ["name"], "properties": {"name": STR, "env": STR}},
+        "resources": {
+            "type": "array",
+            "minItems": 1,
+            "items": {"type": "object", "required": ["type", "id"], "properties": {"type": STR, "id": STR}},
+        },
+        "constraints": {"type": "object", "properties": {"region": STR, "tags": {"type": "object"}}},
+    },
+}
+
+AGENT_SCHEMA = {
+    "type": "object",
+    "required": ["spec_version", "agent", "control_loop"],
+    "properties": {
+        "spec_version": STR,
+        "agent": {
+            "type": "object",
+            "required": ["name"],
+            "properties": {"name": STR, "description": STR, "version": STR},
+        },
+        "inputs": {"type": "object"},
+        "control_loop": {
+            "type": "object",
+            "required": ["steps"],
+            "properties": {
+                "steps": {
+                    "type": "array",
+                    "minItems": 1,
+                    "items": {
+                        "type": "object",
+                        "required": ["id"],
+                        "properties": {"id": STR, "action": STR, "tool": STR, "condition": STR, "logic": STR},
+                    },
+                },
+            },
+        },
+        "tools": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["name", "command"],
+                "properties": {
+                    "name": STR,
+                    "command": STR,
+                    "read_only": {"type": "boolean"},
+                    "safe": {"type": "boolean"},
+                },
+            },
+        },
+        "security": {"type": "object"},
+        "constraints": {"type": "object"},
+    },
+}
+
+# Front-matter is optional in the markdown specs; when present it must look like this
+MARKDOWN_FRONT_MATTER_SCHEMA = {
+    "type": "object",
+    "properties": {"title": STR, "status": STR, "owner": STR, "version": {"type": "scalar"}, "tags": STR_LIST},
+}
+
+
+def _duplicates(values: List) -> List:
+    # Only string ids are compared; the schema check already reports other types
+    seen, dupes = set(), []
+    for v in values:
+        if not isinstance(v, str):
+            continue
+        if v in seen and v not in dupes:
+            dupes.append(v)
+        seen.add(v)
+    return dupes
+
+
+def _as_list(value) -> List:
+    # Rules run even when the schema check failed, so never trust the shape
+    return value if isinstance(value, list) else []
+
+
+def pipeline_rules(doc: Dict, errors: List[str], warnings: List[str]):
+    stages = [s for s in _as_list(doc.get("stages")) if isinstance(s, dict)]
+    ids = [s.get("id") for s in stages]
+    for dupe in _duplicates(ids):
+        errors.append(f"stages: duplicate stage id '{dupe}'")
+    for stage in stages:
+        for need in _as_list(stage.get("needs")):
+            if need not in ids:
+                errors.append(f"stages.{stage.get('id')}: needs unknown stage '{need}'")
+        jobs = [j for j in _as_list(stage.get("jobs")) if isinstance(j, dict)]
+        for dupe in _duplicates([j.get("name") for j in jobs]):
+            errors.append(f"stages.{stage.get('id')}: duplicate job name '{dupe}'")
+        for job in jobs:
+            if "command" not in job and "type" not in job:
+                errors.append(f"stages.{stage.get('id')}.{job.get('name')}: job needs a 'command' or a 'type'")
+
+
+def infra_rules(doc: Dict, errors: List[str], warnings: List[str]):
+    ids = [r.get("id") for r in _as_list(doc.get("resources")) if isinstance(r, dict)]
+    for dupe in _duplicates(ids):
+        errors.append(f"resources: duplicate resource id '{dupe}'")
+
+
+def agent_rules(doc: Dict, errors: List[str], warnings: List[str]):
+    loop = doc.get("control_loop")
+    steps = [s for s in _as_list(loop.get("steps") if isinstance(loop, dict) else None) if isinstance(s, dict)]
+    for dupe in _duplicates([s.get("id") for s in steps]):
+        errors.append(f"control_loop.steps: duplicate step id '{dupe}'")
+    tools = {t.get("name") for t in _as_list(doc.get("tools")) if isinstance(t, dict) and isinstance(t.get("name"), str)}
+    for step in steps:
+        if isinstance(step.get("tool"), str) and step["tool"] not in tools:
+            warnings.append(f"control_loop.steps.{step.get('id')}: tool '{step['tool']}' is not declared in tools")
+
+
+def _heading(title: str) -> "re.Pattern":
+    # Matches '## Title' and numbered '## 2. Title (...)'
+    return re.compile(rf"^##\s+(?:\d+\.\s*)?{re.escape(title)}\b", re.MULTILINE)
+
+
+class SpecKind:
+    def __init__(self, name: str, schema: Optional[Dict] = None, rules: Optional[Callable] = None,
+                 sections: Tuple[str, ...] = (), markdown: bool = False):
+        self.name = name
+        self.markdown = markdown
+        self.check = compile_schema(schema) if schema else None
+        self.rules = rules
+        self.sections = tuple((title, _heading(title)) for title in sections)
+
+KINDS = {
+    "pipeline": SpecKind("pipeline", PIPELINE_SCHEMA, pipeline_rules),
+    "infra": SpecKind("infra", INFRA_SCHEMA, infra_rules),
+    "agent": SpecKind("agent", AGENT_SCHEMA, agent_rules),
+    "feature": SpecKind(
+        "feature", MARKDOWN_FRONT_MATTER_SCHEMA, markdown=True,
+        sections=("Overview", "Functional Requirements", "Constraints", "Edge Cases"),
+    ),
+    "agent-prompt": SpecKind(
+        "agent-prompt", MARKDOWN_FRONT_MATTER_SCHEMA, markdown=True,
+        sections=("Context", "The Spec", "Your Task", "Output Requirements"),
+    ),
+}
+
+
+def detect_yaml_kind(doc) -> Optional[str]:
+    if not isinstance(doc, dict):
+        return None
+    if doc.get("kind") == "InfrastructureSpec":
+        return "infra"
+    if "spec_version" in doc or "control_loop" in doc:
+        return "agent"
+    if "stages" in doc:
+        return "pipeline"
+    return None
+
+
+def detect_markdown_kind(front_matter: Dict, body: str) -> Optional[str]:
+    declared = front_matter.get("kind") if isinstance(front_matter, dict) else None
+    if isinstance(declared, str) and declared in KINDS and KINDS[declared].markdown:
+        return declared
+    title = body.lstrip().split("\n", 1)[0]
+    if title.startswith("# Feature Specification"):
+        return "feature"
+    if title.startswith("# Agent Task Specification"):
+        return "agent-prompt"
+    return None
+
+
+# ==========================================
+# 3. Linting
+# ==========================================
+
+_FRONT_MATTER = re.compile(r"\A---\s*\n(.*?)\n---\s*(?:\n|\Z)", re.DOTALL)
+
+
+def split_front_matter(text: str) -> Tuple[Optional[str], str]:
+    match = _FRONT_MATTER.match(text)
+    if not match:
+        return None, text
+    return match.group(1), text[match.end():]
+
+
+def lint_file(path: str) -> Dict:
+    """
+    Lints one file. Never raises: problems end up in the result's 'errors'.
+    """
+    result = {"path": path, "kind": None, "errors": [], "warnings": []}
+    errors = result["errors"]
+    try:
+        with open(path, 'r', encoding="utf-8") as f:
+            text = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        errors.append(f"unreadable: {e}")
+        return result
+
+    try:
+        _lint_text(path, text, result)
+    except yaml.YAMLError as e:
+        errors.append(f"invalid YAML: {e}".replace("\n", " "))
+    except Exception as e:
+        # One odd file must not take down a lint of thousands
+        errors.append(f"internal error: {type(e).__name__}: {e}")
+    return result
+
+
+def _lint_text(path: str, text: str, result: Dict):
+    errors, warnings = result["errors"], result["warnings"]
+    if path.endswith(".md"):
+        raw, body = split_front_matter(text)
+        front_matter = yaml.load(raw, Loader=YamlLoader) if raw else {}
+        result["kind"] = detect_markdown_kind(front_matter, body)
+        if result["kind"] is None:
+            errors.append("unknown spec kind: expected a '# Feature Specification' or "
+                          "'# Agent Task Specification' title, or a markdown 'kind' in front-matter")
+            return
+        kind = KINDS[result["kind"]]
+        if raw is not None:
+            kind.check(front_matter, "front_matter", errors)
+        for title, pattern in kind.sections:
+            if not pattern.search(body):
+                errors.append(f"missing section '## {title}'")
+    else:
+        doc = yaml.load(text, Loader=YamlLoader)
+        result["kind"] = detect_yaml_kind(doc)
+        if result["kind"] is None:
+            errors.append("unknown spec kind: expected 'kind: InfrastructureSpec', "
+                          "'spec_version'/'control_loop' (agent) or 'stages' (pipeline)")
+            return
+        kind = KINDS[result["kind"]]
+        kind.check(doc, "$", errors)
+        if kind.rules:
+            kind.rules(doc, errors, warnings)
+
+
+def find_specs(roots: List[str]) -> List[str]:
+    paths = []
+    for root in roots:
+        # Missing roots are kept so lint_file reports them instead of a clean run
+        if os.path.isfile(root) or not os.path.exists(root):
+            paths.append(os.path.normpath(root))
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+            paths.extend(os.path.normpath(os.path.join(dirpath, n)) for n in filenames if n.endswith(SPEC_SUFFIXES))
+    return sorted(paths)
+
+
+def lint_all(paths: List[str], jobs: int) -> List[Dict]:
+    if jobs <= 1 or len(paths) < SERIAL_THRESHOLD:
+        return [lint_file(p) for p in paths]
+    # Big chunks keep IPC overhead low when there are thousands of small files
+    chunksize = max(1, len(paths) // (jobs * 8))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(lint_file, paths, chunksize=chunksize))
+
+
+def build_report(results: List[Dict], elapsed: float) -> Dict:
+    by_kind: Dict[str, int] = {}
+    for r in results:
+        by_kind[r["kind"] or "unknown"] = by_kind.get(r["kind"] or "unknown", 0) + 1
+    return {
+        "summary": {
+            "files_linted": len(results),
+            "files_with_errors": sum(1 for r in results if r["errors"]),
+            "errors": sum(len(r["errors"]) for r in results),
+            "warnings": sum(len(r["warnings"]) for r in results),
+            "by_kind": by_kind,
+            "elapsed_seconds": round(elapsed, 3),
+        },
+        "files": results,
+    }
+
+
+def print_text(report: Dict):
+    for r in report["files"]:
+        icon = "❌" if r["errors"] else ("⚠️ " if r["warnings"] else "✅")
+        print(f"{icon} {r['path']} [{r['kind'] or 'unknown'}]")
+        for e in r["errors"]:
+            print(f"    error: {e}")
+        for w in r["warnings"]:
+            print(f"    warning: {w}")
+    s = report["summary"]
+    print(f"\n{s['files_linted']} spec(s) linted, {s['errors']} error(s), "
+          f"{s['warnings']} warning(s) in {s['elapsed_seconds']}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lint every spec file under the given paths")
+    parser.add_argument("paths", nargs="*", help="Files or directories to scan (default: .)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--format", choices=["json", "text"], default="text", help="Report format on stdout")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    start = time.monotonic()
+    paths = find_specs(args.paths or ["."])
+    if args.paths and not paths:
+        print(f"No spec files found under: {' '.join(args.paths)}", file=sys.stderr)
+        sys.exit(1)
+    results = lint_all(paths, args.jobs)
+    report = build_report(results, time.monotonic() - start)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.format == "json":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_text(report)
+
+    sys.exit(1 if report["summary"]["errors"] else 0)
+
+
+if __name__ == "__main__":
+    main()
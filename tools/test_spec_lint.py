@@ -0,0 +1,143 @@
+# tools/test_spec_lint.py
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import spec_lint
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PIPELINE = """meta: {name: svc, version: "1.0"}
+stages:
+  - id: build
+    jobs: [{name: compile, command: make}]
+"""
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def check(schema, value):
+    errors = []
+    spec_lint.compile_schema(schema)(value, "$", errors)
+    return errors
+
+
+def test_schema_type_required_and_enum_errors():
+    schema = {
+        "type": "object",
+        "required": ["name", "kind"],
+        "properties": {
+            "name": {"type": "string"},
+            "kind": {"type": "string", "enum": ["a", "b"]},
+            "count": {"type": "number"},
+            "items": {"type": "array", "minItems": 1, "items": {"type": "string"}},
+        },
+    }
+    assert check(schema, {"name": "x", "kind": "a", "count": 1, "items": ["y"]}) == []
+    assert check(schema, {"kind": "a"}) == ["$: missing required key 'name'"]
+    assert check(schema, {"name": 1, "kind": "c"}) == [
+        "$.name: expected string, got int",
+        "$.kind: must be one of ['a', 'b'], got 'c'",
+    ]
+    assert check(schema, {"name": "x", "kind": "a", "count": True}) == ["$.count: expected number, got bool"]
+    assert check(schema, {"name": "x", "kind": "a", "items": []}) == ["$.items: expected at least 1 item(s)"]
+    assert check(schema, {"name": "x", "kind": "a", "items": [3]}) == ["$.items[0]: expected string, got int"]
+    assert check(schema, ["not", "an", "object"]) == ["$: expected object, got list"]
+
+
+def test_split_front_matter():
+    raw, body = spec_lint.split_front_matter("---\ntitle: x\n---\n# Feature Specification\n")
+    assert raw == "title: x"
+    assert body == "# Feature Specification\n"
+    assert spec_lint.split_front_matter("# No front matter\n") == (None, "# No front matter\n")
+
+
+def test_markdown_front_matter_is_validated(tmp_path):
+    path = write(tmp_path, "f-spec.md",
+                 "---\ntitle: [1]\n---\n# Feature Specification: x\n## 1. Overview\n")
+    result = spec_lint.lint_file(path)
+    assert result["kind"] == "feature"
+    assert "front_matter.title: expected string, got list" in result["errors"]
+    assert "missing section '## Edge Cases'" in result["errors"]
+
+
+def test_markdown_kind_must_be_a_markdown_kind(tmp_path):
+    path = write(tmp_path, "x-spec.md", "---\nkind: pipeline\n---\n# Notes\n")
+    result = spec_lint.lint_file(path)
+    assert result["kind"] is None
+    assert result["errors"][0].startswith("unknown spec kind")
+
+
+def test_unknown_kind_is_reported(tmp_path):
+    path = write(tmp_path, "infra.spec.yaml", "kind: InfrastructureSpc\nresources: []\n")
+    result = spec_lint.lint_file(path)
+    assert result["errors"][0].startswith("unknown spec kind")
+
+
+def test_malformed_input_does_not_crash(tmp_path):
+    paths = [
+        write(tmp_path, "a.spec.yaml", "meta: {name: x, version: '1'}\nstages: [{id: [x], jobs: [{name: j, command: c}]}]\n"),
+        write(tmp_path, "b.spec.yaml", "spec_version: '1'\nagent: {name: a}\ncontrol_loop: {steps: [{id: [s], tool: [t]}]}\ntools: [{name: [n], command: c}]\n"),
+        write(tmp_path, "c.spec.yaml", "resources: [\n"),
+    ]
+    report = spec_lint.build_report(spec_lint.lint_all(paths, jobs=1), 0.0)
+    by_path = {r["path"]: r for r in report["files"]}
+    assert "$.stages[0].id: expected string, got list" in by_path[paths[0]]["errors"]
+    assert "$.control_loop.steps[0].id: expected string, got list" in by_path[paths[1]]["errors"]
+    assert by_path[paths[2]]["errors"][0].startswith("invalid YAML")
+    assert not any(e.startswith("internal error") for r in report["files"] for e in r["errors"])
+
+
+def test_repo_specs_are_clean():
+    report = spec_lint.build_report(spec_lint.lint_all(spec_lint.find_specs([REPO_ROOT]), jobs=1), 0.0)
+    assert report["summary"]["errors"] == 0
+    assert set(report["summary"]["by_kind"]) == {"pipeline", "infra", "agent", "feature", "agent-prompt"}
+
+
+def test_serial_and_pooled_runs_match(tmp_path):
+    bad = "meta: {name: x}\nstages: [{id: a, needs: [zz], jobs: [{name: j}]}]\n"
+    paths = []
+    for i in range(spec_lint.SERIAL_THRESHOLD + 10):
+        paths.append(write(tmp_path, f"s{i}.spec.yaml", bad if i % 7 == 0 else PIPELINE))
+    paths.append(write(tmp_path, "broken.spec.yaml", "stages: [{id: [x], jobs: []}]\n"))
+
+    serial = spec_lint.build_report(spec_lint.lint_all(paths, jobs=1), 0.0)
+    pooled = spec_lint.build_report(spec_lint.lint_all(paths, jobs=2), 0.0)
+    assert serial == pooled
+    assert serial["summary"]["files_with_errors"] > 0
+
+
+def test_unexpected_exception_is_recorded_per_file(tmp_path, monkeypatch):
+    def boom(doc, errors, warnings):
+        raise RuntimeError("rule bug")
+    monkeypatch.setattr(spec_lint.KINDS["pipeline"], "rules", boom)
+    result = spec_lint.lint_file(write(tmp_path, "p.spec.yaml", PIPELINE))
+    assert result["errors"] == ["internal error: RuntimeError: rule bug"]
+
+
+def run_main(monkeypatch, *paths):
+    monkeypatch.setattr(sys, "argv", ["spec_lint.py", *paths])
+    try:
+        spec_lint.main()
+    except SystemExit as e:
+        return e.code
+    return 0
+
+
+def test_missing_path_is_an_error(tmp_path, monkeypatch, capsys):
+    missing = str(tmp_path / "nope")
+    assert spec_lint.find_specs([missing]) == [missing]
+    assert run_main(monkeypatch, missing) == 1
+    assert "No such file" in capsys.readouterr().out
+
+
+def test_explicit_path_without_specs_fails(tmp_path, monkeypatch, capsys):
+    write(tmp_path, "README.md", "# not a spec\n")
+    assert run_main(monkeypatch, str(tmp_path)) == 1
+    assert "No spec files found" in capsys.readouterr().err
+    write(tmp_path, "p.spec.yaml", PIPELINE)
+    assert run_main(monkeypatch, str(tmp_path)) == 0